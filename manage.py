@@ -14,25 +14,34 @@ import os
 import sys
 import argparse
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add scripts directory to Python path
 sys.path.append(str(Path(__file__).parent / 'scripts'))
 
 from repo_config import RepoConfig
-from repo_manager import DebianRepoManager
-from repo_sign import RepoSigner
+
+# Set once the root logger has been configured by setup_logging()
+_LOG_CONFIGURED = False
 
 def setup_logging():
     """
     Configure logging for the management script.
     
     Sets up logging with appropriate handlers and formatters for both
-    file and console output.
+    file and console output. Only the first call configures handlers;
+    later calls return the same logger without reopening the log file.
     
     Returns:
         Logger: Configured logging instance
     """
+    global _LOG_CONFIGURED
+    if _LOG_CONFIGURED:
+        return logging.getLogger('manage')
+    _LOG_CONFIGURED = True
+
+    RepoConfig.LOG_DIR.mkdir(parents=True, exist_ok=True)
     logging.basicConfig(
         level=getattr(logging, RepoConfig.LOG_LEVEL),
         format=RepoConfig.LOG_FORMAT,
@@ -58,6 +67,10 @@ class RepositoryManager:
 
     def __init__(self):
         """Initialize the repository manager with all required components."""
+        # Imported here so that --help and argument errors don't pay for them
+        from repo_manager import DebianRepoManager
+        from repo_sign import RepoSigner
+
         self.logger = setup_logging()
         self.repo_manager = DebianRepoManager(RepoConfig.BASE_DIR)
         self.signer = RepoSigner()
@@ -80,19 +93,15 @@ class RepositoryManager:
         Returns:
             bool: True if all operations were successful, False otherwise
         """
-        if not os.path.exists(package_path):
-            self.logger.error(f"Package file not found: {package_path}")
-            return False
-
-        if distribution not in RepoConfig.DISTRIBUTIONS:
+        if distribution not in RepoConfig.DISTRIBUTIONS_SET:
             self.logger.error(f"Invalid distribution: {distribution}")
             return False
 
-        if component not in RepoConfig.COMPONENTS:
+        if component not in RepoConfig.COMPONENTS_SET:
             self.logger.error(f"Invalid component: {component}")
             return False
 
-        # Add package to repository
+        # Add package to repository (this also reports a missing file)
         if not self.repo_manager.add_package(package_path, distribution, component):
             return False
 
@@ -113,16 +122,36 @@ class RepositoryManager:
         Updates package indices and signs Release files for specified
         distribution or all distributions.
         
+        Distributions are independent and mostly wait on file I/O and gpg
+        subprocesses, so they are processed concurrently in a thread pool.
+        
         Args:
             distribution (str, optional): Specific distribution to update.
                 If None, updates all distributions.
+                
+        Returns:
+            bool: True if every distribution was signed successfully
         """
         distributions = [distribution] if distribution else RepoConfig.DISTRIBUTIONS
+
+        with ThreadPoolExecutor(max_workers=min(8, len(distributions))) as executor:
+            results = list(executor.map(self._update_one, distributions))
+
+        return all(results)
+
+    def _update_one(self, dist):
+        """
+        Regenerate and sign the indices of a single distribution.
         
-        for dist in distributions:
-            self.logger.info(f"Updating indices for {dist}")
-            self.repo_manager.update_indices(dist, None)  # Update all components
-            self.signer.sign_release(dist)
+        Args:
+            dist (str): Distribution to update
+            
+        Returns:
+            bool: True if the Release file was signed successfully
+        """
+        self.logger.info(f"Updating indices for {dist}")
+        self.repo_manager.update_indices(dist, None)  # Update all components
+        return self.signer.sign_release(dist)
 
     def init_repository(self):
         """
@@ -137,23 +166,17 @@ class RepositoryManager:
         self.logger.info("Initializing repository structure...")
         
         try:
-            # Create base directories
-            for directory in [RepoConfig.POOL_DIR, RepoConfig.DISTS_DIR, 
-                            RepoConfig.WEB_DIR, RepoConfig.LOG_DIR]:
-                directory.mkdir(parents=True, exist_ok=True)
-                self.logger.info(f"Created directory: {directory}")
+            RepoConfig.invalidate_structure_cache()
+
+            # Create base directories and distribution structure
+            init_dirs = RepoConfig.get_init_dirs()
+            for directory in init_dirs:
+                os.makedirs(directory, 0o755, exist_ok=True)
+            self.logger.info(f"Created {len(init_dirs)} directories under {RepoConfig.BASE_DIR}")
 
             # Export GPG key
             self.signer.export_public_key()
 
-            # Initialize distribution structure
-            for dist in RepoConfig.DISTRIBUTIONS:
-                dist_path = RepoConfig.get_dist_path(dist)
-                for component in RepoConfig.COMPONENTS:
-                    for arch in RepoConfig.ARCHITECTURES:
-                        (dist_path / component / f"binary-{arch}").mkdir(parents=True, exist_ok=True)
-                    (dist_path / component / "source").mkdir(parents=True, exist_ok=True)
-
             self.logger.info("Repository initialization complete")
             return True
             
@@ -170,6 +193,10 @@ def main():
     - add-package: Add a new package
     - update: Update repository indices
     """
+    # 'init' takes no arguments, so dispatch it without building the parsers
+    if sys.argv[1:] == ['init']:
+        sys.exit(0 if RepositoryManager().init_repository() else 1)
+
     parser = argparse.ArgumentParser(description='Debian HPC Repository Manager')
     subparsers = parser.add_subparsers(dest='command', help='Commands')
 
@@ -187,6 +214,10 @@ def main():
     update_parser.add_argument('--distribution', help='Specific distribution to update')
 
     args = parser.parse_args()
+    if args.command is None:
+        parser.print_help()
+        sys.exit(1)
+
     manager = RepositoryManager()
 
     if args.command == 'init':
@@ -7,27 +7,68 @@ It's primarily used for testing the repository system and demonstrating
 package creation and management features.
 
 The module creates a simple Debian package with basic executable content
-and proper metadata, suitable for testing repository operations.
+and proper metadata, suitable for testing repository operations. The .deb
+is assembled in-process (an ar archive holding debian-binary,
+control.tar.gz and data.tar.gz), so no dpkg-buildpackage/debhelper run
+is needed.
 """
 
+import gzip
+import hashlib
+import io
 import os
 import sys
-import subprocess
+import tarfile
 import tempfile
-import shutil
-from pathlib import Path
 from datetime import datetime
 
+# File templates, filled in with bytes %-formatting
+_CONTROL_TPL = b"""Package: %(name)b
+Version: %(version)b
+Architecture: all
+Maintainer: Repository Administrator <admin@debian-hpc.local>
+Installed-Size: %(installed_size)d
+Section: science
+Priority: optional
+Description: %(description)b
+ This is a test package for the debian-hpc repository.
+ .
+ Generated on %(date)b
+"""
+
+_CHANGELOG_TPL = b"""%(name)b (%(version)b) stable; urgency=low
+
+  * Test package for debian-hpc repository
+
+ -- Repository Administrator <admin@debian-hpc.local>  %(date)b
+"""
+
+_COPYRIGHT = b"""Format: https://www.debian.org/doc/packaging-manuals/copyright-format/1.0/
+Source: https://github.com/yourusername/debian-hpc
+
+Files: *
+Copyright: 2025 Repository Administrator <admin@debian-hpc.local>
+License: MIT
+ Permission is hereby granted, free of charge, to any person obtaining a copy
+ of this software and associated documentation files (the "Software"), to deal
+ in the Software without restriction, including without limitation the rights
+ to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+ copies of the Software, and to permit persons to whom the Software is
+ furnished to do so, subject to the following conditions:
+ .
+ The above copyright notice and this permission notice shall be included in all
+ copies or substantial portions of the Software.
+"""
+
 def create_test_package(name, version, description):
     """
     Create a test Debian package with given specifications.
     
-    This function creates a complete Debian package including:
+    This function creates a complete binary Debian package including:
     - Basic executable file
-    - Package metadata (control file)
+    - Package metadata (control file and md5sums)
     - Copyright information
     - Changelog
-    - Build system configuration
     
     Args:
         name (str): Name of the package
@@ -37,167 +78,205 @@ def create_test_package(name, version, description):
     Returns:
         bool: True if package creation was successful, False otherwise
     """
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Create package directory structure
-        package_dir = Path(temp_dir) / f"{name}-{version}"
-        debian_dir = package_dir / "debian"
-        os.makedirs(debian_dir)
-
-        try:
-            # Create executable content
-            _create_executable(package_dir, name, version)
-            
-            # Create debian control files
-            _create_control_file(debian_dir, name, version, description)
-            _create_changelog(debian_dir, name, version)
-            _create_copyright(debian_dir)
-            _create_rules(debian_dir, name)
-            
-            # Build the package
-            return _build_package(package_dir, temp_dir, name, version)
-            
-        except Exception as e:
-            print(f"Failed to create package: {e}", file=sys.stderr)
-            return False
-
-def _create_executable(package_dir, name, version):
+    # Use one timestamp so control, changelog and archive members agree
+    now = datetime.now()
+    ctrl_date = now.strftime('%Y-%m-%d %H:%M:%S')
+    chg_date = now.strftime('%a, %d %b %Y %H:%M:%S +0000')
+    mtime = int(now.timestamp())
+
+    try:
+        # Create package contents as (path, data, mode) entries
+        files = [
+            _create_executable(name, version),
+            _create_copyright(name),
+            _create_changelog(name, version, chg_date),
+        ]
+
+        # Create package metadata
+        control = _create_control_file(name, version, description, ctrl_date, files)
+
+        # Build the package
+        return _build_package(name, version, control, files, mtime)
+
+    except Exception as e:
+        print(f"Failed to create package: {e}", file=sys.stderr)
+        return False
+
+def _create_executable(name, version):
     """
     Create a simple executable file for the test package.
     
     Args:
-        package_dir (Path): Root directory of the package
         name (str): Name of the package/executable
         version (str): Version string
+        
+    Returns:
+        tuple: (path, data, mode) entry for usr/bin/<name>
     """
-    bin_dir = package_dir / "usr" / "bin"
-    os.makedirs(bin_dir)
-    
     # Create a simple shell script
-    with open(bin_dir / name, "w") as f:
-        f.write(f"""#!/bin/bash
+    script = f"""#!/bin/bash
 echo "This is {name} version {version}"
-""")
-    # Make the script executable
-    os.chmod(bin_dir / name, 0o755)
+"""
+    return f"usr/bin/{name}", script.encode(), 0o755
 
-def _create_control_file(debian_dir, name, version, description):
+def _create_control_file(name, version, description, ctrl_date, files):
     """
-    Create the debian/control file with package metadata.
+    Create the DEBIAN/control file with package metadata.
     
     Args:
-        debian_dir (Path): Debian directory path
         name (str): Package name
         version (str): Package version
         description (str): Package description
+        ctrl_date (str): Generation timestamp shown in the description
+        files (list): (path, data, mode) entries shipped by the package
+        
+    Returns:
+        bytes: Contents of the control file
     """
-    with open(debian_dir / "control", "w") as f:
-        f.write(f"""Source: {name}
-Section: science
-Priority: optional
-Maintainer: Repository Administrator <admin@debian-hpc.local>
-Build-Depends: debhelper-compat (= 13)
-
-Package: {name}
-Architecture: all
-Depends: ${{misc:Depends}}
-Description: {description}
- This is a test package for the debian-hpc repository.
- .
- Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-""")
+    installed_size = sum((len(data) + 1023) // 1024 for _, data, _ in files)
+    return _CONTROL_TPL % {
+        b"name": name.encode(),
+        b"version": version.encode(),
+        b"installed_size": installed_size,
+        b"description": description.encode(),
+        b"date": ctrl_date.encode(),
+    }
 
-def _create_changelog(debian_dir, name, version):
+def _create_changelog(name, version, chg_date):
     """
-    Create the debian/changelog file.
+    Create the compressed Debian changelog.
     
     Args:
-        debian_dir (Path): Debian directory path
         name (str): Package name
         version (str): Package version
+        chg_date (str): RFC 2822 timestamp for the changelog trailer
+        
+    Returns:
+        tuple: (path, data, mode) entry for changelog.Debian.gz
     """
-    with open(debian_dir / "changelog", "w") as f:
-        f.write(f"""{name} ({version}) stable; urgency=low
+    changelog = _CHANGELOG_TPL % {
+        b"name": name.encode(),
+        b"version": version.encode(),
+        b"date": chg_date.encode(),
+    }
+    return (f"usr/share/doc/{name}/changelog.Debian.gz",
+            gzip.compress(changelog, compresslevel=9, mtime=0), 0o644)
 
-  * Test package for debian-hpc repository
-
- -- Repository Administrator <admin@debian-hpc.local>  {datetime.now().strftime('%a, %d %b %Y %H:%M:%S +0000')}
-""")
+def _create_copyright(name):
+    """
+    Create the copyright file.
+    
+    Args:
+        name (str): Package name
+        
+    Returns:
+        tuple: (path, data, mode) entry for the copyright file
+    """
+    return f"usr/share/doc/{name}/copyright", _COPYRIGHT, 0o644
 
-def _create_copyright(debian_dir):
+def _tar_gz(files, mtime):
     """
-    Create the debian/copyright file.
+    Build a gzip-compressed tar archive in memory.
+    
+    Parent directories are added before the files in them, and every
+    member is owned by root, as in archives produced by dpkg-deb.
     
     Args:
-        debian_dir (Path): Debian directory path
+        files (list): (path, data, mode) entries, paths relative to the root
+        mtime (int): Modification time for every member
+        
+    Returns:
+        bytes: The .tar.gz archive
     """
-    with open(debian_dir / "copyright", "w") as f:
-        f.write("""Format: https://www.debian.org/doc/packaging-manuals/copyright-format/1.0/
-Source: https://github.com/yourusername/debian-hpc
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz", format=tarfile.GNU_FORMAT) as tar:
+        def add(path, data=None, mode=0o755):
+            info = tarfile.TarInfo(path)
+            info.mtime = mtime
+            info.mode = mode
+            info.uname = info.gname = "root"
+            if data is None:
+                info.type = tarfile.DIRTYPE
+                tar.addfile(info)
+            else:
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
 
-Files: *
-Copyright: 2025 Repository Administrator <admin@debian-hpc.local>
-License: MIT
- Permission is hereby granted, free of charge, to any person obtaining a copy
- of this software and associated documentation files (the "Software"), to deal
- in the Software without restriction, including without limitation the rights
- to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
- copies of the Software, and to permit persons to whom the Software is
- furnished to do so, subject to the following conditions:
- .
- The above copyright notice and this permission notice shall be included in all
- copies or substantial portions of the Software.
-""")
+        seen = set()
+        add(".")
+        for path, data, mode in files:
+            parts = path.split("/")
+            for i in range(1, len(parts)):
+                parent = "./" + "/".join(parts[:i])
+                if parent not in seen:
+                    seen.add(parent)
+                    add(parent)
+            add("./" + path, data, mode)
+    return buf.getvalue()
 
-def _create_rules(debian_dir, name):
+def _ar_member(name, data, mtime):
     """
-    Create the debian/rules file with build instructions.
+    Encode one member of an ar archive.
     
     Args:
-        debian_dir (Path): Debian directory path
-        name (str): Package name
+        name (str): Member name (at most 16 characters)
+        data (bytes): Member contents
+        mtime (int): Member modification time
+        
+    Returns:
+        bytes: 60-byte header, data, and padding to an even length
     """
-    with open(debian_dir / "rules", "w") as f:
-        f.write(f"""#!/usr/bin/make -f
-%:
-	dh $@
-
-override_dh_auto_install:
-	install -D -m 755 usr/bin/{name} debian/{name}/usr/bin/{name}
-""")
-    # Make rules file executable
-    os.chmod(debian_dir / "rules", 0o755)
+    header = f"{name:<16}{mtime:<12}{0:<6}{0:<6}{'100644':<8}{len(data):<10}`\n"
+    padding = b"\n" if len(data) % 2 else b""
+    return header.encode("ascii") + data + padding
 
-def _build_package(package_dir, temp_dir, name, version):
+def _build_package(name, version, control, files, mtime):
     """
-    Build the Debian package using dpkg-buildpackage.
+    Assemble the .deb archive and write it to the current directory.
     
     Args:
-        package_dir (Path): Package source directory
-        temp_dir (str): Temporary directory path
         name (str): Package name
         version (str): Package version
+        control (bytes): Contents of the control file
+        files (list): (path, data, mode) entries shipped by the package
+        mtime (int): Modification time for archive members
         
     Returns:
         bool: True if build was successful, False otherwise
     """
+    md5sums = b"".join(
+        f"{hashlib.md5(data, usedforsecurity=False).hexdigest()}  {path}\n".encode() for path, data, _ in files
+    )
+    control_tar = _tar_gz([("control", control, 0o644), ("md5sums", md5sums, 0o644)], mtime)
+    data_tar = _tar_gz(files, mtime)
+
+    deb = b"".join([
+        b"!<arch>\n",
+        _ar_member("debian-binary", b"2.0\n", mtime),
+        _ar_member("control.tar.gz", control_tar, mtime),
+        _ar_member("data.tar.gz", data_tar, mtime),
+    ])
+
+    # Write to a fresh temporary file next to the destination and rename,
+    # so a failed write never leaves a truncated .deb (or a stray
+    # temporary) behind, and no existing path is ever written through
+    deb_file = f"{name}_{version}_all.deb"
+    tmp_file = None
     try:
-        # Build the package without signing
-        subprocess.run(
-            ["dpkg-buildpackage", "-us", "-uc", "-b"],
-            cwd=package_dir,
-            check=True
-        )
-        
-        # Move the built package to the current directory
-        deb_file = f"{name}_{version}_all.deb"
-        shutil.move(Path(temp_dir) / deb_file, deb_file)
-        print(f"Successfully created package: {deb_file}")
-        return True
-        
-    except subprocess.CalledProcessError as e:
+        fd, tmp_file = tempfile.mkstemp(prefix=f".{deb_file}.", suffix=".tmp", dir=".")
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "wb") as f:
+            f.write(deb)
+        os.replace(tmp_file, deb_file)
+    except OSError as e:
+        if tmp_file is not None and os.path.exists(tmp_file):
+            os.unlink(tmp_file)
         print(f"Failed to build package: {e}", file=sys.stderr)
         return False
 
+    print(f"Successfully created package: {deb_file}")
+    return True
+
 def main():
     """
     Main entry point for command-line usage.
@@ -9,8 +9,10 @@ The RepoConfig class serves as a central configuration point for the entire repo
 providing consistent settings across all components.
 """
 
+import json
 import os
 from pathlib import Path
+from typing import Final
 
 class RepoConfig:
     """
@@ -23,10 +25,14 @@ class RepoConfig:
         REPO_NAME (str): The name of the repository
         REPO_DESCRIPTION (str): A brief description of the repository
         REPO_VERSION (str): The version of the repository software
-        DISTRIBUTIONS (list): Available distribution branches (e.g., stable, testing)
-        COMPONENTS (list): Available repository components (main, contrib, non-free)
-        ARCHITECTURES (list): Supported CPU architectures
+        DISTRIBUTIONS (tuple): Available distribution branches (e.g., stable, testing)
+        COMPONENTS (tuple): Available repository components (main, contrib, non-free)
+        ARCHITECTURES (tuple): Supported CPU architectures
+        DISTRIBUTIONS_SET, COMPONENTS_SET, ARCHITECTURES_SET (frozenset):
+            Set views of the above for membership checks
         GPG_KEY_ID (str): The GPG key ID used for signing packages and metadata
+        GPG_BATCH (bool): Sign without prompting, relying on gpg-agent's cache
+        GPG_PASSPHRASE_FILE (str): File holding the key passphrase, or None
         Various path configurations for repository structure
     """
     
@@ -36,15 +42,26 @@ class RepoConfig:
     REPO_VERSION = "1.0.0"
 
     # Repository Structure
-    # These lists define the basic organization of the repository
-    DISTRIBUTIONS = ["stable", "testing"]  # Available distribution branches
-    COMPONENTS = ["main", "contrib", "non-free"]  # Package components
-    ARCHITECTURES = ["amd64", "i386"]  # Supported architectures
+    # These tuples define the basic organization of the repository
+    DISTRIBUTIONS: Final = ("stable", "testing")  # Available distribution branches
+    COMPONENTS: Final = ("main", "contrib", "non-free")  # Package components
+    ARCHITECTURES: Final = ("amd64", "i386")  # Supported architectures
+
+    # Set views of the tuples above for membership checks
+    DISTRIBUTIONS_SET = frozenset(DISTRIBUTIONS)
+    COMPONENTS_SET = frozenset(COMPONENTS)
+    ARCHITECTURES_SET = frozenset(ARCHITECTURES)
 
     # GPG Configuration
     # Used for signing packages and repository metadata
     GPG_KEY_ID = "D8D87602D00F0680F44BD468F90FBC2AE63EB38F"
     GPG_SIGNING_USER = "Nishanth <nishanthc264@gmail.com>"
+    # Signing prompts for the key passphrase by default. For unattended runs
+    # (cron, CI) either set GPG_PASSPHRASE_FILE, read by gpg in loopback mode,
+    # or set GPG_BATCH when gpg-agent already caches the passphrase or the
+    # key has none; batch signing fails rather than prompting.
+    GPG_BATCH = False
+    GPG_PASSPHRASE_FILE = None
 
     # Web Interface Configuration
     # Settings for the Flask web application
@@ -54,29 +71,41 @@ class RepoConfig:
 
     # Path Configuration
     # All paths are relative to the repository root directory
-    BASE_DIR = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    POOL_DIR = BASE_DIR / "pool"      # Package storage
-    DISTS_DIR = BASE_DIR / "dists"    # Distribution metadata
-    WEB_DIR = BASE_DIR / "web"        # Web interface files
-    LOG_DIR = BASE_DIR / "logs"       # Log files
-
-    # Create required directories if they don't exist
-    LOG_DIR.mkdir(exist_ok=True)
+    BASE_DIR: Final = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    POOL_DIR: Final = BASE_DIR / "pool"      # Package storage
+    DISTS_DIR: Final = BASE_DIR / "dists"    # Distribution metadata
+    WEB_DIR: Final = BASE_DIR / "web"        # Web interface files
+    LOG_DIR: Final = BASE_DIR / "logs"       # Log files
 
     # Logging Configuration
-    LOG_FILE = LOG_DIR / "repo.log"
+    LOG_FILE: Final = LOG_DIR / "repo.log"
     LOG_LEVEL = "INFO"
     LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
     # Package validation settings
     # Required fields in package control files
-    REQUIRED_FIELDS = [
+    REQUIRED_FIELDS = frozenset([
         "Package",
         "Version",
         "Architecture",
         "Maintainer",
         "Description"
-    ]
+    ])
+
+    # Repository metadata settings
+    # MD5 is no longer used by APT for verification; SHA256 is always emitted.
+    # Enable for clients that still require MD5sum/MD5Sum entries.
+    EMIT_MD5 = False
+
+    # Persistent record of the last successful validate_structure walk
+    STRUCTURE_CACHE_FILE: Final = LOG_DIR / ".structure_cache.json"
+
+    # Filled in on first use by get_init_dirs()
+    _init_dirs = None
+
+    # Path caches for the configured distributions/components, keyed by
+    # (kind, name) and filled in on first use by the get_*_path helpers
+    _path_cache = {}
 
     @classmethod
     def get_dist_path(cls, distribution):
@@ -89,7 +118,8 @@ class RepoConfig:
         Returns:
             Path: Path object pointing to the distribution directory
         """
-        return cls.DISTS_DIR / distribution
+        return cls._cached_path("dist", distribution, cls.DISTRIBUTIONS_SET,
+                                lambda: cls.DISTS_DIR / distribution)
 
     @classmethod
     def get_pool_path(cls, component):
@@ -102,7 +132,8 @@ class RepoConfig:
         Returns:
             Path: Path object pointing to the component directory in the pool
         """
-        return cls.POOL_DIR / component
+        return cls._cached_path("pool", component, cls.COMPONENTS_SET,
+                                lambda: cls.POOL_DIR / component)
 
     @classmethod
     def get_release_file(cls, distribution):
@@ -115,46 +146,202 @@ class RepoConfig:
         Returns:
             Path: Path object pointing to the Release file
         """
-        return cls.get_dist_path(distribution) / "Release"
+        return cls._cached_path("release", distribution, cls.DISTRIBUTIONS_SET,
+                                lambda: cls.get_dist_path(distribution) / "Release")
+
+    @classmethod
+    def _cached_path(cls, kind, name, known, build):
+        """
+        Return a memoized path for a configured name.
+        
+        Only names in the configured set are cached, so arbitrary input
+        (e.g. from a URL) cannot grow the cache.
+        
+        Args:
+            kind (str): Cache namespace ('dist', 'pool' or 'release')
+            name (str): Distribution or component name
+            known (frozenset): Names that may be cached
+            build (callable): Builds the Path on a cache miss
+            
+        Returns:
+            Path: The requested path
+        """
+        key = (kind, name)
+        path = cls._path_cache.get(key)
+        if path is None:
+            path = build()
+            if name in known:
+                cls._path_cache[key] = path
+        return path
+
+    @classmethod
+    def get_init_dirs(cls):
+        """
+        Get every directory created by repository initialization.
+        
+        The list is computed once: the base directories first, then the
+        binary-<arch> and source directory of each distribution component.
+        Creating those leaves also creates the dist/component parents.
+        
+        Returns:
+            tuple: Directory paths as strings, parents before children
+        """
+        if cls._init_dirs is None:
+            dirs = [str(d) for d in (cls.POOL_DIR, cls.DISTS_DIR, cls.WEB_DIR, cls.LOG_DIR)]
+            for dist in cls.DISTRIBUTIONS:
+                for comp in cls.COMPONENTS:
+                    comp_path = cls.get_dist_path(dist) / comp
+                    dirs.extend(str(comp_path / f"binary-{arch}") for arch in cls.ARCHITECTURES)
+                    dirs.append(str(comp_path / "source"))
+            cls._init_dirs = tuple(dirs)
+        return cls._init_dirs
+
+    @staticmethod
+    def _subdirs(path):
+        """
+        List the names of the directories directly under a path.
+        
+        Uses a single scandir pass; DirEntry.is_dir() is answered from the
+        directory listing itself, so only symlinks need a stat. Symlinks
+        are followed, so e.g. a pool/ linked to another volume still counts.
+        
+        Args:
+            path (Path): Directory to list
+            
+        Returns:
+            set: Names of child directories, empty if the path is unreadable
+        """
+        try:
+            with os.scandir(path) as it:
+                return {entry.name for entry in it if entry.is_dir()}
+        except OSError:
+            return set()
 
     @classmethod
     def validate_structure(cls):
         """
         Validate the repository directory structure.
         
+        A successful walk is recorded in STRUCTURE_CACHE_FILE together with
+        the mtime of every directory the walk lists; while those all match,
+        no expected entry can have been added or removed, and the walk is
+        skipped.
+        
         Returns:
             bool: True if the structure is valid, False otherwise
         """
+        # Taken before the walk, so changes made during it invalidate the record
+        try:
+            stamp = {str(d): os.stat(d).st_mtime_ns for d in cls._scanned_dirs()}
+        except OSError:
+            # Some expected directory is missing
+            return False
+
+        if cls._read_structure_stamp() == stamp:
+            return True
+
+        valid = cls._check_structure()
+        if valid:
+            cls._write_structure_stamp(stamp)
+        return valid
+
+    @classmethod
+    def _scanned_dirs(cls):
+        """
+        List every directory whose entries _check_structure() inspects.
+        
+        Adding or removing an entry updates the mtime of its parent, so
+        these mtimes cover every directory the walk expects to find.
+        
+        Returns:
+            list: Paths of the scanned directories
+        """
+        dirs = [cls.BASE_DIR, cls.POOL_DIR, cls.DISTS_DIR]
+        for dist in cls.DISTRIBUTIONS:
+            dist_path = cls.get_dist_path(dist)
+            dirs.append(dist_path)
+            dirs.extend(dist_path / comp for comp in cls.COMPONENTS)
+        return dirs
+
+    @classmethod
+    def invalidate_structure_cache(cls):
+        """
+        Forget the recorded validate_structure result.
+        """
+        try:
+            cls.STRUCTURE_CACHE_FILE.unlink()
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def _read_structure_stamp(cls):
+        """
+        Load the mtimes recorded by the last successful structure walk.
+        
+        Returns:
+            dict: Recorded mtimes by directory, or None if there is no usable record
+        """
+        try:
+            with open(cls.STRUCTURE_CACHE_FILE) as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(record, dict) or not record.pop("valid", False):
+            return None
+        return record
+
+    @classmethod
+    def _write_structure_stamp(cls, stamp):
+        """
+        Record a successful structure walk.
+        
+        Written to a temporary file and renamed so readers never see a
+        partial record. Failure to write only costs a walk next time.
+        
+        Args:
+            stamp (dict): mtimes of the directories from _scanned_dirs()
+        """
+        tmp_file = cls.STRUCTURE_CACHE_FILE.with_suffix(".tmp")
+        try:
+            with open(tmp_file, "w") as f:
+                json.dump(dict(stamp, valid=True), f)
+            os.replace(tmp_file, cls.STRUCTURE_CACHE_FILE)
+        except OSError:
+            pass
+
+    @classmethod
+    def _check_structure(cls):
+        """
+        Walk the expected directory tree, one scandir per directory.
+        
+        Returns:
+            bool: True if every expected directory is present, False otherwise
+        """
         try:
             # Check main directories
-            for dir_path in [cls.POOL_DIR, cls.DISTS_DIR, cls.WEB_DIR, cls.LOG_DIR]:
-                if not dir_path.exists():
-                    return False
+            base_dirs = {d.name for d in (cls.POOL_DIR, cls.DISTS_DIR, cls.WEB_DIR, cls.LOG_DIR)}
+            if not base_dirs.issubset(cls._subdirs(cls.BASE_DIR)):
+                return False
 
             # Check pool components
-            for component in cls.COMPONENTS:
-                if not (cls.POOL_DIR / component).exists():
-                    return False
+            components = cls.COMPONENTS_SET
+            if not components.issubset(cls._subdirs(cls.POOL_DIR)):
+                return False
 
             # Check distribution structure
+            if not cls.DISTRIBUTIONS_SET.issubset(cls._subdirs(cls.DISTS_DIR)):
+                return False
+
+            comp_subdirs = {f"binary-{arch}" for arch in cls.ARCHITECTURES}
+            comp_subdirs.add("source")
             for dist in cls.DISTRIBUTIONS:
                 dist_path = cls.get_dist_path(dist)
-                if not dist_path.exists():
+                if not components.issubset(cls._subdirs(dist_path)):
                     return False
-                
-                # Check component directories
+
+                # Check architecture and source directories
                 for comp in cls.COMPONENTS:
-                    comp_path = dist_path / comp
-                    if not comp_path.exists():
-                        return False
-                    
-                    # Check architecture directories
-                    for arch in cls.ARCHITECTURES:
-                        if not (comp_path / f"binary-{arch}").exists():
-                            return False
-                    
-                    # Check source directory
-                    if not (comp_path / "source").exists():
+                    if not comp_subdirs.issubset(cls._subdirs(dist_path / comp)):
                         return False
 
             return True
@@ -12,14 +12,162 @@ The DebianRepoManager class encapsulates all repository management operations, i
 - Metadata file maintenance
 """
 
+import fcntl
 import os
 import sys
 import logging
-import subprocess
 import hashlib
 import gzip
-from datetime import datetime
+import io
+import json
+import lzma
+import shutil
+import subprocess
+import tarfile
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from itertools import repeat
 from pathlib import Path
+from repo_config import RepoConfig
+
+# Fewer files than this (pool packages, or index files to checksum) are
+# processed serially, since handing single files to worker threads gains nothing
+PARALLEL_MIN_PACKAGES = 2
+
+# Caches live under <repo_root>/cache/<dist>/, outside the published dists/
+# tree. Stanza cache of each Packages index, kept by _generate_packages_gz:
+PACKAGES_CACHE_NAME = "Packages-{component}-{arch}.json"
+
+# Part of every stanza cache key; bump when the stanza layout changes
+PACKAGES_CACHE_VERSION = 1
+
+# Name caches had when they were kept inside dists/; removed when found
+LEGACY_CACHE_NAME = ".cache.json"
+
+# Checksum cache of each distribution's index files, kept by
+# _generate_release_file (also under <repo_root>/cache/<dist>/)
+RELEASE_CACHE_NAME = "Release.json"
+
+# ioctl that reflinks one file into another (linux/fs.h); fcntl only
+# exports it from Python 3.12
+FICLONE = getattr(fcntl, "FICLONE", 0x40049409)
+
+# Index files written per component/architecture and listed in Release
+INDEX_FILES = ("Packages", "Packages.gz", "Packages.xz")
+
+class _HashingWriter:
+    """
+    Binary file wrapper that checksums everything written through it.
+    
+    Lets index files be hashed for the Release file while they are being
+    written, instead of reading them back afterwards. Closing the wrapper
+    closes the underlying file.
+    
+    Attributes:
+        name (str): Base name of the file, by default that of the underlying file
+        size (int): Number of bytes written so far
+    """
+
+    def __init__(self, fileobj, with_md5=True, name=None):
+        self._fileobj = fileobj
+        self.name = name if name is not None else os.path.basename(fileobj.name)
+        self.size = 0
+        self._md5 = hashlib.md5(usedforsecurity=False) if with_md5 else None
+        self._sha256 = hashlib.sha256()
+
+    def write(self, data):
+        if self._md5 is not None:
+            self._md5.update(data)
+        self._sha256.update(data)
+        self.size += len(data)
+        return self._fileobj.write(data)
+
+    def flush(self):
+        self._fileobj.flush()
+
+    def close(self):
+        self._fileobj.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def checksums(self):
+        """
+        Get the checksums of everything written so far.
+        
+        Returns:
+            tuple: (size, md5 hex digest, sha256 hex digest) of the data
+                written; md5 is None if the writer was created without MD5
+        """
+        md5sum = self._md5.hexdigest() if self._md5 is not None else None
+        return self.size, md5sum, self._sha256.hexdigest()
+
+def write_atomic(path, data):
+    """
+    Write a file under a temporary name and rename it into place.
+    
+    Readers (apt, the web view) see either the old or the new contents,
+    never a partial file, and a failed write leaves no temporary behind.
+    
+    Args:
+        path (Path): File to write
+        data (bytes): New contents, published with mode 0644
+    """
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            os.fchmod(f.fileno(), 0o644)
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+def _describe_deb(deb, component, arch):
+    """
+    Build the Packages stanza for one pool package.
+    
+    Safe to run from worker threads: it touches no shared state.
+    
+    Args:
+        deb (Path): Path to the .deb file in the pool
+        component (str): Component the package belongs to
+        arch (str): Architecture of the index being generated
+        
+    Returns:
+        tuple: (stanza, error). stanza is '' when the package is built for
+            another architecture; error is a message if it is unreadable.
+    """
+    # Get package info from the control file inside the .deb, then its
+    # checksums; the file may vanish or turn out unreadable at either step
+    try:
+        control = DebianRepoManager._read_control(deb)
+
+        # Only list packages built for this architecture or for all
+        if control.get("Architecture") not in (arch, "all"):
+            return "", None
+
+        size, md5sum, sha256 = DebianRepoManager._file_checksums(deb, RepoConfig.EMIT_MD5)
+    except (OSError, ValueError, tarfile.TarError) as e:
+        return None, str(e)
+
+    # Package information, then location and checksums
+    lines = [f"{field}: {value}" for field, value in control.items()]
+    lines.append(f"Filename: pool/{component}/{deb.name}")
+    lines.append(f"Size: {size}")
+    if md5sum is not None:
+        lines.append(f"MD5sum: {md5sum}")
+    lines.append(f"SHA256: {sha256}")
+    return "\n".join(lines) + "\n\n", None
 
 class DebianRepoManager:
     """
@@ -32,6 +180,7 @@ class DebianRepoManager:
         repo_root (Path): Root directory of the repository
         pool_dir (Path): Directory for storing package files
         dists_dir (Path): Directory for distribution metadata
+        cache_dir (Path): Directory for index caches, never published
         logger (Logger): Logging instance for the manager
     """
 
@@ -45,6 +194,7 @@ class DebianRepoManager:
         self.repo_root = Path(repo_root)
         self.pool_dir = self.repo_root / 'pool'
         self.dists_dir = self.repo_root / 'dists'
+        self.cache_dir = self.repo_root / 'cache'
         self.setup_logging()
 
     def setup_logging(self):
@@ -52,7 +202,13 @@ class DebianRepoManager:
         Configure logging for the repository manager.
         
         Sets up logging to both file and console with appropriate format and level.
+        Handlers are only installed when nothing has configured logging yet
+        (e.g. when run standalone rather than from manage.py), so creating
+        several managers does not reopen the log file each time.
         """
+        self.logger = logging.getLogger('RepoManager')
+        if logging.getLogger().handlers:
+            return
         logging.basicConfig(
             level=logging.INFO,
             format='%(asctime)s - %(levelname)s - %(message)s',
@@ -61,11 +217,10 @@ class DebianRepoManager:
                 logging.StreamHandler()
             ]
         )
-        self.logger = logging.getLogger('RepoManager')
 
     def _generate_packages_gz(self, dist_path, component, arch):
         """
-        Generate Packages and Packages.gz files for a component.
+        Generate Packages, Packages.gz and Packages.xz files for a component.
         
         Args:
             dist_path (Path): Path to the distribution directory
@@ -73,114 +228,389 @@ class DebianRepoManager:
             arch (str): Architecture (amd64, i386)
             
         Returns:
-            tuple: Paths to the generated Packages and Packages.gz files
+            dict: Checksums of the written index files, mapping the path
+                relative to the distribution (e.g. 'main/binary-amd64/Packages')
+                to a (size, md5, sha256) tuple. Empty if nothing was written.
         """
         packages_dir = dist_path / component / f"binary-{arch}"
         packages_dir.mkdir(parents=True, exist_ok=True)
-        packages_file = packages_dir / "Packages"
-        packages_gz_file = packages_dir / "Packages.gz"
 
-        # Find all .deb files in the pool for this component
+        # Find all .deb files in the pool for this component. scandir hands
+        # back entries whose stat data is cached, and sorting by name keeps
+        # the Packages output (and so the Release checksums) reproducible.
         pool_component_dir = self.pool_dir / component
-        if not pool_component_dir.exists():
-            return
+        try:
+            with os.scandir(pool_component_dir) as it:
+                debs = sorted((e for e in it if e.name.endswith('.deb')),
+                              key=lambda e: e.name)
+        except FileNotFoundError:
+            return {}
 
-        # Generate Packages file content
-        with open(packages_file, 'w') as f:
-            for deb in pool_component_dir.glob('*.deb'):
-                # Get package info using dpkg-deb
-                cmd = ['dpkg-deb', '-I', str(deb)]
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode != 0:
-                    continue
+        # Reuse stanzas of packages unchanged since the last run, keyed on
+        # name, mtime and size, so only new or modified packages are hashed
+        cache_file = self.cache_dir / dist_path.name / PACKAGES_CACHE_NAME.format(
+            component=component, arch=arch)
+        cache = self._load_cache(cache_file)
+        new_cache = {}
+        stanzas = {}
+        changed = []
+        for entry in debs:
+            # Follow symlinks, so a rebuilt link target invalidates its stanza.
+            # Dangling links and files removed since the scan are skipped.
+            try:
+                st = entry.stat()
+            except OSError as e:
+                self.logger.warning("Skipping unreadable package %s: %s", entry.name, e)
+                continue
+            key = {"version": PACKAGES_CACHE_VERSION, "mtime_ns": st.st_mtime_ns,
+                   "size": st.st_size, "md5": RepoConfig.EMIT_MD5}
+            cached = cache.get(entry.name)
+            if cached is not None and cached["key"] == key:
+                stanzas[entry.name] = cached["stanza"]
+                new_cache[entry.name] = cached
+            else:
+                changed.append((Path(entry.path), key))
 
-                # Write package information
-                f.write(f"Package: {deb.stem.split('_')[0]}\n")
-                f.write(f"Version: {deb.stem.split('_')[1]}\n")
-                f.write(f"Architecture: {arch}\n")
-                f.write(f"Filename: pool/{component}/{deb.name}\n")
-                
-                # Calculate checksums
-                with open(deb, 'rb') as deb_file:
-                    content = deb_file.read()
-                    f.write(f"Size: {len(content)}\n")
-                    f.write(f"MD5sum: {hashlib.md5(content).hexdigest()}\n")
-                    f.write(f"SHA256: {hashlib.sha256(content).hexdigest()}\n")
+        # Describe changed packages in parallel. Hashing dominates and the
+        # hashers release the GIL, so threads scale without worker processes.
+        debs = [deb for deb, _ in changed]
+        if len(debs) >= PARALLEL_MIN_PACKAGES:
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                results = list(executor.map(_describe_deb, debs, repeat(component),
+                                            repeat(arch)))
+        else:
+            results = [_describe_deb(deb, component, arch) for deb in debs]
+
+        for (deb, key), (stanza, error) in zip(changed, results):
+            if error:
+                self.logger.warning("Skipping unreadable package %s: %s", deb.name, error)
+                continue
+            stanzas[deb.name] = stanza
+            new_cache[deb.name] = {"key": key, "stanza": stanza}
+
+        # Write Packages and its compressed versions side by side in one pass.
+        # APT prefers .xz, which is typically 2-3x smaller than .gz. Every
+        # output is hashed as it is written, for the Release file. The files
+        # are written under temporary names and renamed into place, so apt
+        # and the web view never see a truncated or half-written index.
+        with_md5 = RepoConfig.EMIT_MD5
+        renames = []
+        try:
+            with ExitStack() as stack:
+                writers = []
+                for index_name in INDEX_FILES:
+                    fd, tmp = tempfile.mkstemp(prefix=f".{index_name}.", suffix=".tmp",
+                                               dir=packages_dir)
+                    renames.append((tmp, packages_dir / index_name))
+                    writers.append(stack.enter_context(
+                        _HashingWriter(os.fdopen(fd, 'wb'), with_md5, index_name)))
+                    os.fchmod(fd, 0o644)
+                f, f_gz_raw, f_xz_raw = writers
+                f_gz = stack.enter_context(gzip.GzipFile(fileobj=f_gz_raw, mode='wb'))
+                f_xz = stack.enter_context(lzma.LZMAFile(f_xz_raw, 'wb', preset=6))
+                for name in sorted(stanzas):
+                    stanza = stanzas[name].encode('utf-8')
+                    f.write(stanza)
+                    f_gz.write(stanza)
+                    f_xz.write(stanza)
+
+            for tmp, index_file in renames:
+                os.replace(tmp, index_file)
+        except BaseException:
+            for tmp, _ in renames:
+                try:
+                    os.unlink(tmp)
+                except FileNotFoundError:
+                    pass
+            raise
+
+        self._save_cache(cache_file, new_cache)
+        (packages_dir / LEGACY_CACHE_NAME).unlink(missing_ok=True)
+
+        prefix = f"{component}/binary-{arch}/"
+        return {prefix + writer.name: writer.checksums()
+                for writer in (f, f_gz_raw, f_xz_raw)}
+
+    def _load_cache(self, cache_file):
+        """
+        Load a JSON cache written by a previous run.
+        
+        Args:
+            cache_file (Path): Cache file to read
+            
+        Returns:
+            dict: Cached entries; empty if the cache is missing or unreadable
+        """
+        try:
+            with open(cache_file) as f:
+                cache = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.warning("Ignoring unreadable cache %s: %s", cache_file, e)
+            return {}
+        return cache if isinstance(cache, dict) else {}
+
+    def _save_cache(self, cache_file, cache):
+        """
+        Atomically replace a JSON cache.
+        
+        Args:
+            cache_file (Path): Cache file to write
+            cache (dict): Entries to keep
+        """
+        tmp_file = cache_file.with_name(cache_file.name + ".tmp")
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_file, 'w') as f:
+                json.dump(cache, f)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            self.logger.warning("Could not write cache %s: %s", cache_file, e)
+
+    @staticmethod
+    def _ar_members(f):
+        """
+        Iterate over the members of an ar archive (the .deb container).
+        
+        Only the 60-byte member headers are read. While a member is being
+        yielded the file is positioned at the start of its data, so the
+        caller may read it; the next step seeks past it either way.
+        
+        Args:
+            f (file): Binary file object positioned at the start of the file
+            
+        Yields:
+            tuple: (member name, member size)
+            
+        Raises:
+            ValueError: If the file is not an ar archive
+        """
+        if f.read(8) != b"!<arch>\n":
+            raise ValueError("not an ar archive")
+        offset = 8
+        while True:
+            f.seek(offset)
+            header = f.read(60)
+            if len(header) < 60:
+                return
+            if header[58:60] != b"`\n":
+                raise ValueError("corrupt ar member header")
+            size = int(header[48:58])
+            yield header[:16].decode('ascii').rstrip().rstrip("/"), size
+            offset += 60 + size + (size & 1)
+
+    @staticmethod
+    def _read_control(deb_path):
+        """
+        Read the control fields of a .deb package without unpacking it.
+        
+        A .deb is an ar archive; the control file lives in its
+        control.tar.{gz,xz,bz2} (or uncompressed control.tar) member, which
+        is read with the tarfile module instead of running dpkg-deb.
+        tarfile cannot decompress control.tar.zst (dpkg's default on
+        Ubuntu), so those packages fall back to dpkg-deb.
+        
+        Args:
+            deb_path (Path): Path to the .deb package file
+            
+        Returns:
+            dict: Control fields in file order. Multi-line values keep their
+                continuation lines, so "f'{field}: {value}'" reproduces them.
                 
-                f.write("\n")
+        Raises:
+            ValueError: If the file is not a .deb or has no control file
+        """
+        with open(deb_path, 'rb') as f:
+            for name, size in DebianRepoManager._ar_members(f):
+                if name.startswith("control.tar"):
+                    control_tar = f.read(size)
+                    break
+            else:
+                raise ValueError("no control.tar member")
 
-        # Create gzipped version
-        with open(packages_file, 'rb') as f_in:
-            with gzip.open(packages_gz_file, 'wb') as f_out:
-                f_out.write(f_in.read())
+        try:
+            with tarfile.open(fileobj=io.BytesIO(control_tar), mode='r:*') as tar:
+                for member in tar:
+                    if member.isfile() and member.name in ("./control", "control"):
+                        text = tar.extractfile(member).read().decode('utf-8')
+                        break
+                else:
+                    raise ValueError("control.tar has no control file")
+        except (tarfile.ReadError, tarfile.CompressionError):
+            text = DebianRepoManager._dpkg_deb_control(deb_path, name)
 
-        return packages_file, packages_gz_file
+        fields = {}
+        field = None
+        for line in text.splitlines():
+            if line[:1] in (" ", "\t") and field is not None:
+                fields[field] += "\n" + line
+            elif ":" in line:
+                field, value = line.split(":", 1)
+                fields[field] = value.strip()
+        if "Package" not in fields:
+            raise ValueError("control file has no Package field")
+        return fields
 
-    def _generate_release_file(self, dist_path, distribution):
+    @staticmethod
+    def _dpkg_deb_control(deb_path, member):
+        """
+        Read the control file of a .deb with dpkg-deb.
+        
+        Used for control archives tarfile cannot open, such as
+        control.tar.zst.
+        
+        Args:
+            deb_path (Path): Path to the .deb package file
+            member (str): Name of the control archive member, for messages
+            
+        Returns:
+            str: Contents of the control file
+            
+        Raises:
+            ValueError: If dpkg-deb is unavailable or cannot read the package
+        """
+        try:
+            result = subprocess.run(['dpkg-deb', '-f', str(deb_path)],
+                                    capture_output=True, check=True)
+        except FileNotFoundError:
+            raise ValueError(f"{member} needs dpkg-deb, which is not installed") from None
+        except subprocess.CalledProcessError as e:
+            raise ValueError(f"dpkg-deb cannot read {member}: "
+                             f"{e.stderr.decode('utf-8', 'replace').strip()}") from None
+        return result.stdout.decode('utf-8')
+
+    def _generate_release_file(self, dist_path, distribution, checksums=None):
         """
         Generate Release file for a distribution.
         
         Args:
             dist_path (Path): Path to the distribution directory
             distribution (str): Distribution name (stable, testing)
+            checksums (dict, optional): Checksums of index files generated in
+                this run, as returned by _generate_packages_gz. Other index
+                files are taken from the distribution's checksum cache while
+                their mtime and size are unchanged, else hashed from disk.
             
         Returns:
             Path: Path to the generated Release file
         """
         release_file = dist_path / "Release"
+        checksums = checksums or {}
+        cache_file = self.cache_dir / distribution / RELEASE_CACHE_NAME
+        cache = self._load_cache(cache_file)
+        new_cache = {}
 
-        with open(release_file, 'w') as f:
-            # Write basic repository information
-            f.write(f"Origin: debian-hpc\n")
-            f.write(f"Label: debian-hpc\n")
-            f.write(f"Suite: {distribution}\n")
-            f.write(f"Codename: {distribution}\n")
-            f.write(f"Date: {datetime.utcnow().strftime('%a, %d %b %Y %H:%M:%S UTC')}\n")
-            f.write(f"Architectures: amd64 i386\n")
-            f.write(f"Components: main contrib non-free\n")
-            f.write(f"Description: Debian HPC Repository\n")
-            
-            # Add checksums section
-            f.write("MD5Sum:\n")
-            f.write("SHA256:\n")
+        # Collect checksums for all component index files
+        known = {}
+        keys = {}
+        missing = []
+        for component in ['main', 'contrib', 'non-free']:
+            for arch in ['amd64', 'i386']:
+                packages_dir = dist_path / component / f"binary-{arch}"
+                if not packages_dir.exists():
+                    continue
 
-            # Generate checksums for all component files
-            for component in ['main', 'contrib', 'non-free']:
-                for arch in ['amd64', 'i386']:
-                    packages_dir = dist_path / component / f"binary-{arch}"
-                    if not packages_dir.exists():
+                for name in INDEX_FILES:
+                    rel_path = f"{component}/binary-{arch}/{name}"
+                    try:
+                        st = (packages_dir / name).stat()
+                    except FileNotFoundError:
                         continue
+                    keys[rel_path] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size,
+                                      "md5": RepoConfig.EMIT_MD5}
+
+                    entry = cache.get(rel_path)
+                    if rel_path in checksums:
+                        known[rel_path] = checksums[rel_path]
+                    elif entry is not None and entry["key"] == keys[rel_path]:
+                        known[rel_path] = entry["checksums"]
+                    else:
+                        missing.append(rel_path)
+
+        # Hash the remaining files concurrently; hashing releases the GIL
+        paths = [dist_path / rel_path for rel_path in missing]
+        if len(paths) >= PARALLEL_MIN_PACKAGES:
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                results = list(executor.map(self._file_checksums, paths,
+                                            repeat(RepoConfig.EMIT_MD5)))
+        else:
+            results = [self._file_checksums(path, RepoConfig.EMIT_MD5) for path in paths]
+        known.update(zip(missing, results))
+
+        # Keep the component/architecture order of the loop above
+        entries = []
+        for rel_path, key in keys.items():
+            sums = known[rel_path]
+            entries.append((rel_path, *sums))
+            new_cache[rel_path] = {"key": key, "checksums": list(sums)}
+
+        self._save_cache(cache_file, new_cache)
+        (dist_path / LEGACY_CACHE_NAME).unlink(missing_ok=True)
+
+        f = io.StringIO()
+        # Write basic repository information
+        f.write(f"Origin: debian-hpc\n")
+        f.write(f"Label: debian-hpc\n")
+        f.write(f"Suite: {distribution}\n")
+        f.write(f"Codename: {distribution}\n")
+        f.write(f"Date: {time.strftime('%a, %d %b %Y %H:%M:%S UTC', time.gmtime())}\n")
+        f.write(f"Architectures: amd64 i386\n")
+        f.write(f"Components: main contrib non-free\n")
+        f.write(f"Description: Debian HPC Repository\n")
+        
+        # Add checksums sections
+        if RepoConfig.EMIT_MD5:
+            f.write("MD5Sum:\n")
+            for rel_path, size, md5sum, _ in entries:
+                f.write(f" {md5sum} {size} {rel_path}\n")
+        f.write("SHA256:\n")
+        for rel_path, size, _, sha256 in entries:
+            f.write(f" {sha256} {size} {rel_path}\n")
 
-                    # Process Packages file
-                    packages = packages_dir / "Packages"
-                    if packages.exists():
-                        self._add_file_checksums(f, packages, component, arch)
+        content = f.getvalue().encode('utf-8')
+        write_atomic(release_file, content)
 
-                    # Process Packages.gz file
-                    packages_gz = packages_dir / "Packages.gz"
-                    if packages_gz.exists():
-                        self._add_file_checksums(f, packages_gz, component, arch)
+        # Precompressed copy, served to HTTP clients that accept gzip. It is
+        # renamed into place after Release, so it is never the older of the two.
+        write_atomic(dist_path / "Release.gz", gzip.compress(content))
 
         return release_file
 
-    def _add_file_checksums(self, release_file, file_path, component, arch):
+    @staticmethod
+    def _file_checksums(file_path, with_md5=True, chunk_size=1 << 20):
         """
-        Add checksums for a file to the Release file.
+        Compute the size, SHA256 and optionally MD5 of a file in a single pass.
+        
+        The file is read into one reused buffer and each chunk is fed to
+        both hashers, so it is never held in memory as a whole. hashlib
+        uses OpenSSL (SHA-NI where the CPU has it) and drops the GIL for
+        each chunk, and both digests are computed from one read of the data,
+        which hashlib.file_digest (one digest per pass) could not do. Plain
+        reads, unlike a memory map, cannot fault if the file is truncated
+        while it is hashed.
         
         Args:
-            release_file (file): Open Release file handle
-            file_path (Path): Path to the file to checksum
-            component (str): Component name
-            arch (str): Architecture name
-        """
-        with open(file_path, 'rb') as f:
-            content = f.read()
-            size = len(content)
-            md5sum = hashlib.md5(content).hexdigest()
-            sha256 = hashlib.sha256(content).hexdigest()
-            rel_path = f"{component}/binary-{arch}/{file_path.name}"
-            release_file.write(f" {md5sum} {size} {rel_path}\n")
-            release_file.write(f" {sha256} {size} {rel_path}\n")
+            file_path (Path): File to checksum
+            with_md5 (bool): Also compute the MD5 digest
+            chunk_size (int): Bytes read and handed to the hashers per update
+            
+        Returns:
+            tuple: (size, md5 hex digest, sha256 hex digest); md5 is None
+                when with_md5 is False
+        """
+        md5 = hashlib.md5(usedforsecurity=False) if with_md5 else None
+        sha256 = hashlib.sha256()
+        size = 0
+        buf = bytearray(chunk_size)
+        with open(file_path, 'rb', buffering=0) as f, memoryview(buf) as view:
+            while n := f.readinto(buf):
+                with view[:n] as chunk:
+                    if md5 is not None:
+                        md5.update(chunk)
+                    sha256.update(chunk)
+                size += n
+        return size, md5.hexdigest() if md5 is not None else None, sha256.hexdigest()
 
     def add_package(self, package_path, distribution, component):
         """
@@ -199,40 +629,69 @@ class DebianRepoManager:
             if not self._verify_package(package_path):
                 raise ValueError("Invalid package file")
 
+            # Refuse packages that would be left out of every Packages index:
+            # an unreadable control file or an architecture we don't index
+            control = self._read_control(package_path)
+            arch = control.get("Architecture")
+            if arch != "all" and arch not in RepoConfig.ARCHITECTURES_SET:
+                raise ValueError(f"Unsupported architecture: {arch}")
+
             # Copy to pool
             dest = self._copy_to_pool(package_path, component)
-            self.logger.info(f"Package added to pool: {dest}")
+            self.logger.info("Package added to pool: %s", dest)
 
             # Update indices
             self.update_indices(distribution, component)
             
             return True
+        except FileNotFoundError as e:
+            # Only a missing package_path is the caller's mistake; anything
+            # else vanishing during the pool copy or indexing is a failure
+            if e.filename is not None and os.fspath(e.filename) == os.fspath(package_path):
+                self.logger.error("Package file not found: %s", package_path)
+            else:
+                self.logger.error("Failed to add package: %s", e)
+            return False
         except Exception as e:
-            self.logger.error(f"Failed to add package: {e}")
+            self.logger.error("Failed to add package: %s", e)
             return False
 
     def _verify_package(self, package_path):
         """
         Verify debian package validity.
         
+        Checks the ar container layout (debian-binary first, then a
+        control.tar.* and a data.tar.* member) from the member headers
+        alone, without decompressing anything. A missing file raises
+        FileNotFoundError instead of being reported as an invalid package.
+        
         Args:
             package_path (str): Path to the .deb package file
             
         Returns:
             bool: True if package is valid, False otherwise
         """
-        try:
-            result = subprocess.run(['dpkg-deb', '-I', package_path],
-                                 capture_output=True, text=True)
-            return result.returncode == 0
-        except Exception as e:
-            self.logger.error(f"Package verification failed: {e}")
-            return False
+        with open(package_path, 'rb') as package:
+            try:
+                names = [name for name, _ in self._ar_members(package)]
+            except (OSError, ValueError) as e:
+                self.logger.error("Package verification failed: %s", e)
+                return False
+        return (names[:1] == ["debian-binary"]
+                and any(name.startswith("control.tar") for name in names)
+                and any(name.startswith("data.tar") for name in names))
 
     def _copy_to_pool(self, package_path, component):
         """
         Copy package to pool directory.
         
+        The pool entry is always a separate file, so changes to package_path
+        after it was added never alter the published package. Where the
+        filesystem supports it the copy is a copy-on-write reflink, which
+        costs no data I/O or extra disk space. The entry is created under a
+        fresh temporary name and renamed into place, replacing any older
+        copy; an existing path is never written through.
+        
         Args:
             package_path (str): Path to the package file
             component (str): Target component
@@ -243,10 +702,79 @@ class DebianRepoManager:
         src = Path(package_path)
         dest = self.pool_dir / component / src.name
         dest.parent.mkdir(parents=True, exist_ok=True)
-        import shutil
-        shutil.copy2(src, dest)
+
+        # Re-adding the pool entry itself; there is nothing to copy
+        try:
+            if os.path.samefile(src, dest):
+                return dest
+        except FileNotFoundError:
+            pass
+
+        tmp = self._copy_temp(src, dest)
+        try:
+            os.replace(tmp, dest)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            raise
         return dest
 
+    @staticmethod
+    def _copy_temp(src, dest):
+        """
+        Copy a file to a new temporary file next to dest.
+        
+        The temporary file is created exclusively by mkstemp, so the copy
+        never writes through a path that already existed.
+        
+        Args:
+            src (Path): File to copy
+            dest (Path): Final destination; the copy is made in its directory
+            
+        Returns:
+            Path: The temporary copy, with src's mode and timestamps
+        """
+        fd, tmp = tempfile.mkstemp(prefix=f".{dest.name}.", suffix=".tmp", dir=dest.parent)
+        tmp = Path(tmp)
+        try:
+            with os.fdopen(fd, 'wb') as out, open(src, 'rb') as f_in:
+                DebianRepoManager._clone_or_copy(f_in, out)
+            shutil.copystat(src, tmp)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return tmp
+
+    @staticmethod
+    def _clone_or_copy(f_in, out):
+        """
+        Copy the contents of one open file into another, empty one.
+        
+        A reflink (FICLONE, on btrfs or XFS) shares the data blocks
+        copy-on-write. Otherwise copy_file_range copies inside the kernel,
+        and a plain userspace copy is the last resort.
+        
+        Args:
+            f_in (file): Binary file to copy from, at offset 0
+            out (file): Binary file to copy into, empty and unbuffered so far
+        """
+        try:
+            fcntl.ioctl(out.fileno(), FICLONE, f_in.fileno())
+            return
+        except OSError:
+            pass
+
+        try:
+            while os.copy_file_range(f_in.fileno(), out.fileno(), 1 << 30):
+                pass
+            return
+        except OSError:
+            # Not supported here (e.g. across filesystems on older kernels);
+            # start over with a userspace copy
+            f_in.seek(0)
+            out.seek(0)
+            out.truncate()
+        shutil.copyfileobj(f_in, out)
+
     def update_indices(self, distribution, component=None):
         """
         Update repository indices.
@@ -255,7 +783,7 @@ class DebianRepoManager:
             distribution (str): Distribution to update
             component (str, optional): Specific component to update. If None, updates all components.
         """
-        self.logger.info(f"Updating indices for {distribution}/{component if component else 'all'}")
+        self.logger.info("Updating indices for %s/%s", distribution, component or 'all')
         
         dist_path = self.dists_dir / distribution
         dist_path.mkdir(parents=True, exist_ok=True)
@@ -263,12 +791,13 @@ class DebianRepoManager:
         components = [component] if component else ['main', 'contrib', 'non-free']
         
         # Generate Packages files for each component and architecture
+        checksums = {}
         for comp in components:
             for arch in ['amd64', 'i386']:
-                self._generate_packages_gz(dist_path, comp, arch)
+                checksums.update(self._generate_packages_gz(dist_path, comp, arch))
 
-        # Generate Release file
-        self._generate_release_file(dist_path, distribution)
+        # Generate Release file, reusing the checksums computed while writing
+        self._generate_release_file(dist_path, distribution, checksums)
 
 def main():
     """
@@ -9,12 +9,14 @@ The RepoSigner class encapsulates all signing operations and key management task
 It ensures the security and authenticity of the repository content through GPG signatures.
 """
 
+import gzip
 import os
 import sys
 import subprocess
 import logging
 from pathlib import Path
 from repo_config import RepoConfig
+from repo_manager import write_atomic
 
 class RepoSigner:
     """
@@ -54,6 +56,7 @@ class RepoSigner:
         logger.setLevel(logging.INFO)
         
         # File handler
+        RepoConfig.LOG_DIR.mkdir(parents=True, exist_ok=True)
         fh = logging.FileHandler(RepoConfig.LOG_FILE)
         fh.setLevel(logging.INFO)
         
@@ -71,6 +74,26 @@ class RepoSigner:
         
         return logger
 
+    def _sign_options(self):
+        """
+        Build the gpg options shared by every signing run.
+        
+        Returns:
+            list: Options for gpg
+            
+        Existing signatures are always overwritten. By default gpg-agent may
+        prompt for the passphrase; RepoConfig.GPG_PASSPHRASE_FILE switches to
+        loopback mode with the passphrase read from that file, and
+        RepoConfig.GPG_BATCH to batch mode without a passphrase source.
+        """
+        options = ['--yes']
+        if RepoConfig.GPG_PASSPHRASE_FILE:
+            options += ['--batch', '--pinentry-mode', 'loopback',
+                        '--passphrase-file', str(RepoConfig.GPG_PASSPHRASE_FILE)]
+        elif RepoConfig.GPG_BATCH:
+            options.append('--batch')
+        return options
+
     def sign_release(self, distribution):
         """
         Sign Release file for a distribution.
@@ -82,10 +105,12 @@ class RepoSigner:
             bool: True if signing was successful, False otherwise
             
         Creates both a detached signature (.gpg) and a clearsigned version (InRelease)
-        of the Release file.
+        of the Release file. The file is read once and piped to both gpg runs.
         """
-        release_file = RepoConfig.get_dist_path(distribution) / "Release"
-        if not release_file.exists():
+        release_file = RepoConfig.get_release_file(distribution)
+        try:
+            release_data = release_file.read_bytes()
+        except FileNotFoundError:
             self.logger.error(f"Release file not found for {distribution}")
             return False
 
@@ -94,26 +119,30 @@ class RepoSigner:
             cmd = [
                 'gpg',
                 '--default-key', self.gpg_key_id,
+                *self._sign_options(),
                 '-abs',
-                '-o', str(release_file.parent / 'Release.gpg'),
-                str(release_file)
+                '-o', str(release_file.parent / 'Release.gpg')
             ]
-            subprocess.run(cmd, check=True)
+            subprocess.run(cmd, input=release_data, check=True)
 
             # Create inline signature (InRelease)
             cmd = [
                 'gpg',
                 '--default-key', self.gpg_key_id,
+                *self._sign_options(),
                 '--clearsign',
-                '-o', str(release_file.parent / 'InRelease'),
-                str(release_file)
+                '-o', str(release_file.parent / 'InRelease')
             ]
-            subprocess.run(cmd, check=True)
+            subprocess.run(cmd, input=release_data, check=True)
+
+            # Precompressed copy, served to HTTP clients that accept gzip
+            inrelease = release_file.parent / 'InRelease'
+            write_atomic(inrelease.with_name('InRelease.gz'), gzip.compress(inrelease.read_bytes()))
 
             self.logger.info(f"Successfully signed Release file for {distribution}")
             return True
 
-        except subprocess.CalledProcessError as e:
+        except (subprocess.CalledProcessError, OSError) as e:
             self.logger.error(f"Failed to sign Release file: {e}")
             return False
 
@@ -134,6 +163,7 @@ class RepoSigner:
             cmd = [
                 'gpg',
                 '--default-key', self.gpg_key_id,
+                *self._sign_options(),
                 '--detach-sign',
                 '--armor',
                 package_path
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 
 from flask import Flask, render_template, send_from_directory, abort, request
+from werkzeug.utils import safe_join
+import functools
 import os
 import sys
 from pathlib import Path
@@ -46,9 +48,9 @@ def docs():
 @app.route('/dist/<distribution>/<component>')
 def component_view(distribution, component):
     """Display information about a specific distribution component."""
-    if distribution not in RepoConfig.DISTRIBUTIONS:
+    if distribution not in RepoConfig.DISTRIBUTIONS_SET:
         abort(404)
-    if component not in RepoConfig.COMPONENTS:
+    if component not in RepoConfig.COMPONENTS_SET:
         abort(404)
     
     dist_path = RepoConfig.get_dist_path(distribution)
@@ -67,19 +69,11 @@ def component_view(distribution, component):
     packages = []
     for arch in architectures:
         packages_file = comp_path / f"binary-{arch}" / "Packages"
-        if packages_file.exists():
-            with open(packages_file) as f:
-                package_info = {}
-                for line in f:
-                    line = line.strip()
-                    if not line and package_info:
-                        packages.append(package_info)
-                        package_info = {}
-                    elif line:
-                        key, value = line.split(": ", 1)
-                        package_info[key] = value
-                if package_info:
-                    packages.append(package_info)
+        try:
+            st = packages_file.stat()
+        except FileNotFoundError:
+            continue
+        packages.extend(_load_packages(str(packages_file), st.st_mtime_ns, st.st_size))
 
     return render_template('component.html',
                          repo_name=RepoConfig.REPO_NAME,
@@ -88,15 +82,76 @@ def component_view(distribution, component):
                          architectures=architectures,
                          packages=packages)
 
+@functools.lru_cache(maxsize=64)
+def _load_packages(path, mtime_ns, size):
+    """Parse a Packages index, cached until the file's mtime or size changes."""
+    return tuple(_parse_packages(path))
+
+def _parse_packages(packages_file):
+    """Parse a Packages index into one dict of fields per stanza."""
+    packages = []
+    # Read the index in one go: a mapping would fault (SIGBUS) if another
+    # tool truncated the file while it is parsed
+    with open(packages_file, 'rb') as f:
+        data = f.read()
+
+    # Cut the index at blank lines, decoding a stanza at a time
+    pos, size = 0, len(data)
+    while pos < size:
+        end = data.find(b"\n\n", pos)
+        if end == -1:
+            end = size
+        stanza = data[pos:end].decode('utf-8')
+        pos = end + 2
+
+        package_info = {}
+        key = None
+        for line in stanza.split("\n"):
+            if line[:1] in (" ", "\t") and key is not None:
+                # Continuation of a multi-line field (e.g. Description)
+                package_info[key] += "\n" + line.strip()
+            elif ":" in line:
+                key, value = line.split(":", 1)
+                package_info[key] = value.strip()
+        if package_info:
+            packages.append(package_info)
+    return packages
+
 @app.route('/pool/<path:filename>')
 def serve_package(filename):
     """Serve package files from the pool directory."""
     return send_from_directory(RepoConfig.POOL_DIR, filename)
 
+# Files written with a gzip-compressed twin (<name>.gz) next to them
+PRECOMPRESSED_FILES = frozenset(['Release', 'InRelease'])
+
 @app.route('/dists/<path:filename>')
 def serve_dist_file(filename):
     """Serve distribution files (Release, Packages.gz, etc.)."""
-    return send_from_directory(RepoConfig.DISTS_DIR, filename)
+    # Hidden files (in-progress temporaries, caches) are never published
+    if any(part.startswith('.') for part in filename.split('/')):
+        abort(404)
+
+    if os.path.basename(filename) not in PRECOMPRESSED_FILES:
+        return send_from_directory(RepoConfig.DISTS_DIR, filename)
+
+    # Serve the precompressed copy when the client accepts gzip and the
+    # copy is at least as new as the file itself
+    response = None
+    # Quality 0 (e.g. 'gzip;q=0') means the client refuses gzip
+    if request.accept_encodings['gzip'] > 0:
+        try:
+            plain = safe_join(str(RepoConfig.DISTS_DIR), filename)
+            if plain and os.stat(plain + '.gz').st_mtime_ns >= os.stat(plain).st_mtime_ns:
+                response = send_from_directory(RepoConfig.DISTS_DIR, filename + '.gz',
+                                               mimetype='text/plain')
+                response.headers['Content-Encoding'] = 'gzip'
+        except OSError:
+            pass
+    if response is None:
+        response = send_from_directory(RepoConfig.DISTS_DIR, filename)
+    response.vary.add('Accept-Encoding')
+    return response
 
 @app.route('/key.gpg')
 def serve_key():